@@ -1,9 +1,16 @@
+import base64
+import gzip
 import json
 import os
+import random
 import re
+import sqlite3
+import sys
+import threading
 import time
 import urllib.parse
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any, Dict, List, Optional
 
 import requests
@@ -11,6 +18,27 @@ from requests import Response, Session
 from urllib3.util.retry import Retry
 from requests.adapters import HTTPAdapter
 
+try:
+    import orjson  # encode/décode JSON en C, nettement plus rapide que stdlib
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import httpx  # fan-out concurrent des pages via AsyncClient
+except ImportError:
+    httpx = None  # type: ignore[assignment]
+
+try:
+    import h2  # noqa: F401  # multiplexage HTTP/2 côté httpx
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+try:
+    import ijson  # parsing JSON incrémental pour les grosses réponses
+except ImportError:
+    ijson = None  # type: ignore[assignment]
+
 
 BASE_URL = "https://op.gg/supervive/"
 USER_AGENT = (
@@ -19,111 +47,359 @@ USER_AGENT = (
 )
 
 
-_XSRF_REGEX = re.compile(r"XSRF-TOKEN=([^;]+)")
-_CACHE_PATH = os.path.join(os.path.dirname(__file__), ".supervive_cache.json")
+try:
+    import brotli  # noqa: F401  # décodage br côté urllib3
+    _ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    # Ne pas annoncer br si aucun décodeur n'est disponible
+    _ACCEPT_ENCODING = "gzip, deflate"
+
+
+_XSRF_REGEX = re.compile(rb"XSRF-TOKEN=([^;]+)")
+_CACHE_PATH = os.path.join(os.path.dirname(__file__), ".supervive_cache.sqlite3")
 
 
 def _now() -> float:
     return time.time()
 
 
+@lru_cache(maxsize=1024)
+def _normalize_pid(player_id: str) -> str:
+    return player_id.replace("-", "")
+
+
+@lru_cache(maxsize=256)
+def _join_url(base: str, path: str) -> str:
+    # `base` se termine toujours par "/"; une simple concaténation suffit
+    # et évite le re-parsing urljoin sur chaque requête
+    return base + path.lstrip("/")
+
+
+def _encode_value(value: Any) -> bytes:
+    raw = orjson.dumps(value) if orjson is not None else json.dumps(value).encode("utf-8")
+    # Les payloads de matchs compressent 5-10x; niveau 1 = quasi gratuit en CPU
+    return gzip.compress(raw, compresslevel=1)
+
+
+def _decode_value(blob: bytes) -> Any:
+    if blob[:2] == b"\x1f\x8b":  # magic gzip; les anciennes entrées restent lisibles
+        blob = gzip.decompress(blob)
+    return orjson.loads(blob) if orjson is not None else json.loads(blob)
+
+
+def _jwt_claims(token: str) -> Dict[str, Any]:
+    """Décode les claims d'un JWT (sans vérifier la signature)."""
+    body = token.split(".", 2)[1]
+    # -len & 3 évite le modulo; orjson accepte les bytes sans décodage UTF-8
+    body += "=" * (-len(body) & 3)
+    raw = base64.urlsafe_b64decode(body)
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+# Chaînes de clés de secours des payloads API (casse variable selon les
+# endpoints); figées en tuples module pour les boucles chaudes
+_MATCH_ID_KEYS = ("match_id", "matchId", "id", "MatchID")
+_UPDATE_MID_KEYS = ("MatchID", "match_id")
+_PID_KEYS = ("player_id_encoded", "playerIdEncoded")
+_HERO_ASSET_KEYS = ("hero_asset_id", "heroAssetId")
+_IS_RANKED_KEYS = ("is_ranked", "IsRanked")
+_ABILITY_KEYS = ("hotkey", "ability", "name")
+_ITEM_ID_KEYS = ("identifier", "id", "name", "asset_id", "assetId")
+_NAME_KEYS = ("name", "Name", "asset_id", "assetId", "id")
+_CREEP_KILLS_KEYS = ("CreepKills", "CreepsKilled", "CreepsKills")
+_HERO_DAMAGE_KEYS = ("HeroDamageDone", "HeroEffectiveDamageDone")
+_GOLD_TREASURE_KEYS = ("GoldFromTreasure", "TreasureGold", "GoldTreasure")
+_GOLD_MONSTERS_KEYS = ("GoldFromMonsters", "MonstersGold", "GoldMonsters")
+
+
+def _first_key(d: Dict[str, Any], keys: tuple) -> Any:
+    """Première valeur truthy parmi `keys`; court-circuite sans construire
+    les booléens intermédiaires d'une chaîne de `or`."""
+    for k in keys:
+        v = d.get(k)
+        if v:
+            return v
+    return None
+
+
+def _print_json(obj: Any) -> None:
+    """Sérialise `obj` en JSON sur stdout (orjson écrit l'UTF-8 directement)."""
+    if orjson is not None:
+        sys.stdout.buffer.write(orjson.dumps(obj))
+        sys.stdout.buffer.write(b"\n")
+        sys.stdout.buffer.flush()
+    else:
+        print(json.dumps(obj, ensure_ascii=False))
+
+
+def _response_json(res: Response) -> Any:
+    # orjson parse les octets bruts directement: pas de str intermédiaire
+    # ni de détection d'encodage comme dans Response.json()
+    if orjson is not None:
+        return orjson.loads(res.content)
+    return res.json()
+
+
 class DiskCache:
-    """Simple disque cache avec expirations absolues ou glissantes.
-
-    Structure JSON:
-    {
-        key: {
-            "value": Any,
-            "expires_at": float timestamp,
-            "sliding": bool,
-            "sliding_ttl": float seconds
-        }
-    }
+    """Cache disque SQLite avec expirations absolues ou glissantes.
+
+    Chaque entrée est une ligne `kv(key, value, expires_at, sliding,
+    sliding_ttl)`; une mutation ne touche que les pages concernées au lieu
+    de réécrire tout le fichier comme l'ancien blob JSON. Le mode WAL rend
+    les écritures append-only et tolère les accès multi-processus
+    (plusieurs invocations CLI simultanées).
     """
 
     def __init__(self, path: str):
         self.path = path
-        self._data: Dict[str, Dict[str, Any]] = {}
-        self._load()
-
-    def _load(self) -> None:
-        if os.path.exists(self.path):
-            try:
-                with open(self.path, "r", encoding="utf-8") as f:
-                    self._data = json.load(f)
-            except Exception:
-                self._data = {}
-
-    def _save(self) -> None:
-        tmp = f"{self.path}.tmp"
-        with open(tmp, "w", encoding="utf-8") as f:
-            json.dump(self._data, f)
-        os.replace(tmp, self.path)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        # Mémo processus: évite SELECT + gunzip + parse JSON pour les clés
+        # relues dans la même invocation (ex: get_match en fan-out threadé)
+        self._memo: Dict[str, tuple[Any, float]] = {}
+
+    def _ensure_conn(self) -> sqlite3.Connection:
+        # Ouverture paresseuse: les commandes qui ne touchent pas au cache
+        # ne paient ni l'open ni les pragmas au démarrage du CLI
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # Cache best-effort régénérable: pas de fsync par commit, le WAL
+            # suffit pour la cohérence inter-processus
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS kv ("
+                "key TEXT PRIMARY KEY, value BLOB, expires_at REAL, sliding INT, sliding_ttl REAL)"
+            )
+            self._conn = conn
+        return self._conn
 
     def get(self, key: str) -> Optional[Any]:
-        item = self._data.get(key)
-        if not item:
-            return None
-        expires_at = item.get("expires_at", 0)
-        if _now() >= expires_at:
-            self._data.pop(key, None)
-            self._save()
+        memo = self._memo.get(key)
+        if memo is not None:
+            value, expires_at = memo
+            if _now() < expires_at:
+                return value
+        with self._lock:
+            row = self._ensure_conn().execute(
+                "SELECT value, expires_at, sliding, sliding_ttl FROM kv WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value_blob, expires_at, sliding, sliding_ttl = row
+            if _now() >= (expires_at or 0):
+                self._conn.execute("DELETE FROM kv WHERE key = ?", (key,))
+                return None
+            if sliding and (sliding_ttl or 0) > 0:
+                # refresh sliding expiration
+                expires_at = _now() + sliding_ttl
+                self._conn.execute(
+                    "UPDATE kv SET expires_at = ? WHERE key = ?", (expires_at, key)
+                )
+        try:
+            value = _decode_value(value_blob)
+        except Exception:
             return None
-        if item.get("sliding"):
-            # refresh sliding expiration
-            ttl = float(item.get("sliding_ttl", 0))
-            if ttl > 0:
-                item["expires_at"] = _now() + ttl
-                self._save()
-        return item.get("value")
+        self._memo[key] = (value, expires_at)
+        return value
+
+    def _set(self, key: str, value: Any, ttl_seconds: float, sliding: bool) -> None:
+        with self._lock:
+            self._ensure_conn().execute(
+                "INSERT OR REPLACE INTO kv (key, value, expires_at, sliding, sliding_ttl) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    key,
+                    _encode_value(value),
+                    _now() + ttl_seconds,
+                    1 if sliding else 0,
+                    ttl_seconds if sliding else 0,
+                ),
+            )
+        self._memo[key] = (value, _now() + ttl_seconds)
 
     def set_absolute(self, key: str, value: Any, ttl_seconds: float) -> None:
-        self._data[key] = {
-            "value": value,
-            "expires_at": _now() + ttl_seconds,
-            "sliding": False,
-            "sliding_ttl": 0,
-        }
-        self._save()
+        self._set(key, value, ttl_seconds, sliding=False)
 
     def set_sliding(self, key: str, value: Any, ttl_seconds: float) -> None:
-        self._data[key] = {
-            "value": value,
-            "expires_at": _now() + ttl_seconds,
-            "sliding": True,
-            "sliding_ttl": ttl_seconds,
-        }
-        self._save()
+        self._set(key, value, ttl_seconds, sliding=True)
 
 
-def _build_session_with_retry(total_timeout_seconds: int = 180) -> Session:
-    session = requests.Session()
-    session.headers.update({"User-Agent": USER_AGENT})
+class _SharedPoolAdapter(HTTPAdapter):
+    """Adapter unique dont le pool keep-alive est partagé entre les chemins
+    avec et sans retry; les retries se débrayent par requête en posant
+    l'attribut `_no_retry` sur la PreparedRequest."""
+
+    _NO_RETRY = Retry(total=0, read=False)
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        # Débrayage par thread: muter self.max_retries sur l'adapter partagé
+        # serait une course sous fan-out threadé (une requête retry
+        # concurrente partirait avec la politique no-retry, ou l'inverse)
+        self._local = threading.local()
+        super().__init__(*args, **kwargs)
+
+    @property
+    def max_retries(self) -> Retry:
+        return self._NO_RETRY if getattr(self._local, "no_retry", False) else self._max_retries
+
+    @max_retries.setter
+    def max_retries(self, value: Retry) -> None:
+        self._max_retries = value
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):  # type: ignore[override]
+        # Blocs de lecture socket de 64 Ko (défaut http.client: 8 Ko): les
+        # payloads de matchs de plusieurs centaines de Ko se lisent en
+        # quelques recv au lieu de dizaines
+        pool_kwargs.setdefault("blocksize", 65536)
+        return super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+
+    def send(self, request, **kwargs):  # type: ignore[override]
+        if getattr(request, "_no_retry", False):
+            self._local.no_retry = True
+            try:
+                return super().send(request, **kwargs)
+            finally:
+                self._local.no_retry = False
+        return super().send(request, **kwargs)
+
 
-    # Configurer retries similaires (grossièrement) à la résilience .NET
-    retry = Retry(
-        total=15,
+class _JitterRetry(Retry):
+    """Retry à backoff exponentiel avec jitter complet.
+
+    Le délai est tiré uniformément dans [0, schedule déterministe]: des
+    clients qui échouent au même instant ne re-tentent pas en phase
+    (effet troupeau sur le serveur déjà en difficulté).
+    """
+
+    def get_backoff_time(self) -> float:
+        return random.uniform(0.0, super().get_backoff_time())
+
+
+class _CircuitBreaker:
+    """Disjoncteur minimal (fermé → ouvert → semi-ouvert).
+
+    Après `threshold` erreurs serveur consécutives, les appels échouent
+    immédiatement pendant `cooldown` secondes au lieu d'empiler retries et
+    timeouts contre un hôte en panne; un appel d'essai repasse à l'issue
+    du délai et referme le circuit s'il réussit.
+    """
+
+    def __init__(self, threshold: int = 5, cooldown: float = 30.0) -> None:
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self._failures >= self.threshold and (time.monotonic() - self._opened_at) < self.cooldown:
+                raise ConnectionError("circuit ouvert: trop d'erreurs serveur consécutives")
+
+    def record(self, success: bool) -> None:
+        with self._lock:
+            if success:
+                self._failures = 0
+            else:
+                self._failures += 1
+                if self._failures >= self.threshold:
+                    self._opened_at = time.monotonic()
+
+
+def _build_session_with_retry() -> Session:
+    session = requests.Session()
+    session.headers.update({
+        "User-Agent": USER_AGENT,
+        "Connection": "keep-alive",
+        "Accept-Encoding": _ACCEPT_ENCODING,
+    })
+
+    # Budget de retries borné: à factor=1.0, 15 tentatives cumulaient des
+    # minutes d'attente sur un serveur durablement en panne
+    retry = _JitterRetry(
+        total=6,
         backoff_factor=1.0,
         status_forcelist=(429, 500, 502, 503, 504),
         allowed_methods=("GET", "POST"),
         respect_retry_after_header=True,
     )
-    adapter = HTTPAdapter(max_retries=retry)
+    # Pools dimensionnés pour le fan-out parallèle; les défauts (10/10)
+    # forcent de nouveaux handshakes TLS en rafale
+    adapter = _SharedPoolAdapter(max_retries=retry, pool_connections=32, pool_maxsize=64, pool_block=False)
     session.mount("http://", adapter)
     session.mount("https://", adapter)
-
-    # On gère les timeouts par appel via paramètres
-    session._total_timeout = total_timeout_seconds  # type: ignore[attr-defined]
     return session
 
 
-def _build_no_retry_session(request_timeout_seconds: int = 15) -> Session:
+_plt = None
+
+
+def _get_plt():
+    """Importe matplotlib (backend Agg) au plus une fois par processus."""
+    global _plt
+    if _plt is None:
+        import matplotlib
+
+        matplotlib.use("Agg")  # rendu hors écran
+        import matplotlib.pyplot as plt
+
+        _plt = plt
+    return _plt
+
+
+LOKI_USER_AGENT = "Loki/UE5-CL-0 (http-legacy) Windows/10.0.26100.1.256.64bit"
+
+
+def _build_mmr_session() -> Session:
+    """Session partagée pour les appels OAuth/MMR (hosts Theorycraft).
+
+    Un pool keep-alive par host évite de repayer TCP+TLS entre l'échange
+    OAuth et l'appel MMR qui le suit.
+    """
     session = requests.Session()
-    session.headers.update({"User-Agent": USER_AGENT})
-    session._request_timeout = request_timeout_seconds  # type: ignore[attr-defined]
+    retry = Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 502, 503, 504))
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=16, pool_maxsize=32)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({
+        "User-Agent": LOKI_USER_AGENT,
+        "Accept-Encoding": _ACCEPT_ENCODING,
+    })
     return session
 
 
+_MMR_SESSION = _build_mmr_session()
+
+
+async def _afetch_mmr_ranks(
+    user_ids: List[str], access_token: str, mmr_base: str, client_version: str
+) -> List[Any]:
+    """Récupère le rank MMR de plusieurs joueurs via httpx.
+
+    Toutes les requêtes multiplexent sur une connexion HTTP/2 unique (si h2
+    est installé), ce qui permet des pipelines batch sans sérialiser les RTT.
+    """
+    import asyncio
+
+    headers = {
+        "Accept": "*/*",
+        "Accept-Encoding": _ACCEPT_ENCODING,
+        "x-theorycraft-clientversion": client_version,
+        "Authorization": f"Bearer {access_token}",
+        "User-Agent": LOKI_USER_AGENT,
+    }
+    base = mmr_base.rstrip("/")
+    limits = httpx.Limits(max_keepalive_connections=16, max_connections=32)
+    async with httpx.AsyncClient(http2=_HTTP2, limits=limits, headers=headers, timeout=60) as client:
+        async def fetch(uid: str) -> Any:
+            res = await client.get(f"{base}/mmr/player-ratings/{uid}/rank")
+            res.raise_for_status()
+            return res.json()
+
+        return await asyncio.gather(*(fetch(u) for u in user_ids))
+
+
 @dataclass
 class DataResponse:
     data: Any
@@ -133,37 +409,103 @@ class SuperviveService:
     def __init__(self) -> None:
         self.base_url = BASE_URL.rstrip("/") + "/"
         self.client = _build_session_with_retry()
-        self.no_retry_client = _build_no_retry_session()
+        # Timeouts par appel, en attributs plutôt qu'accrochés à la Session
+        self._get_timeout = 180
+        self._no_retry_timeout = 15
         self.cache = DiskCache(_CACHE_PATH)
+        self._breaker = _CircuitBreaker()
+        # Bulkhead aligné sur pool_connections: les fan-outs attendent en
+        # file au lieu de déborder le pool (et de repayer des handshakes TLS)
+        self._sem = threading.BoundedSemaphore(32)
 
     def _url(self, path: str) -> str:
-        return urllib.parse.urljoin(self.base_url, path)
-
-    def _get(self, path: str, params: Optional[Dict[str, str]] = None) -> Response:
-        timeout = getattr(self.client, "_total_timeout", 180)
-        return self.client.get(self._url(path), params=params, timeout=timeout)
+        return _join_url(self.base_url, path)
+
+    @staticmethod
+    def _clamp_timeout(timeout: float, deadline: Optional[float]) -> float:
+        # `deadline` est une échéance time.monotonic(): la tranche de budget
+        # restante borne le timeout par appel, et un budget épuisé échoue
+        # avant même d'émettre la requête
+        if deadline is None:
+            return timeout
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError("deadline dépassée avant l'envoi de la requête")
+        return min(timeout, remaining)
+
+    def _get(
+        self,
+        path: str,
+        params: Optional[Dict[str, str]] = None,
+        stream: bool = False,
+        deadline: Optional[float] = None,
+    ) -> Response:
+        timeout = self._clamp_timeout(self._get_timeout, deadline)
+        self._breaker.before_call()
+        try:
+            with self._sem:
+                res = self.client.get(self._url(path), params=params, timeout=timeout, stream=stream)
+        except requests.RequestException:
+            self._breaker.record(False)
+            raise
+        self._breaker.record(res.status_code < 500)
+        return res
+
+    def _send_no_retry(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, str]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        deadline: Optional[float] = None,
+    ) -> Response:
+        # Même session (donc même pool de sockets chauds) que le chemin avec
+        # retry; seul le comportement de retry diffère
+        timeout = self._clamp_timeout(self._no_retry_timeout, deadline)
+        req = requests.Request(method, self._url(path), params=params, headers=headers)
+        prep = self.client.prepare_request(req)
+        prep._no_retry = True  # type: ignore[attr-defined]
+        return self.client.send(prep, timeout=timeout)
 
     def _get_no_retry(self, path: str, params: Optional[Dict[str, str]] = None) -> Response:
-        timeout = getattr(self.no_retry_client, "_request_timeout", 15)
-        return self.no_retry_client.get(self._url(path), params=params, timeout=timeout)
+        return self._send_no_retry("GET", path, params=params)
 
     def _post_no_retry(self, path: str, headers: Optional[Dict[str, str]] = None) -> Response:
-        timeout = getattr(self.no_retry_client, "_request_timeout", 15)
-        return self.no_retry_client.post(self._url(path), headers=headers, timeout=timeout)
+        return self._send_no_retry("POST", path, headers=headers)
 
     # --- Méthodes publiques ---
 
-    def check_player_exists(self, platform: str, unique_display_name: str) -> bool:
+    def check_player_exists(self, platform: str, unique_display_name: str, use_cache: bool = True) -> bool:
+        key = f"check:{platform}:{unique_display_name}"
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return bool(cached)
+
         res = self._get(
             "api/players/check",
             params={"platform": platform, "uniqueDisplayName": unique_display_name},
+            stream=True,
         )
         res.raise_for_status()
-        payload = res.json()
-        exists = payload.get("exists") or payload.get("Exists")
+        # La réponse se résume à un booléen: lire le petit corps puis rendre
+        # la connexion au pool immédiatement
+        res.raw.decode_content = True
+        try:
+            raw = res.raw.read(4096)
+        finally:
+            res.close()
+        payload = orjson.loads(raw) if orjson is not None else json.loads(raw)
+        # Repli de clé sans `or`: un 'exists' à False doit rester False
+        exists = payload.get("exists")
+        if exists is None:
+            exists = payload.get("Exists")
         if exists is None:
             raise ValueError("data is null or missing 'exists'")
-        return bool(exists)
+        exists = bool(exists)
+        # TTL court pour les négatifs: un joueur inexistant peut apparaître
+        self.cache.set_absolute(key, exists, ttl_seconds=600 if exists else 60)
+        return exists
 
     def search_players(self, query: str, use_cache: bool = True) -> List[Dict[str, Any]]:
         key = f"search:{query}"
@@ -174,13 +516,17 @@ class SuperviveService:
 
         res = self._get("api/players/search", params={"query": query})
         res.raise_for_status()
-        data = res.json()
+        data = _response_json(res)
 
-        # Expiration absolue 7 jours
-        self.cache.set_absolute(key, data, ttl_seconds=7 * 24 * 3600)
+        # Expiration absolue 7 jours; les résultats vides ne sont gardés
+        # qu'une minute pour ne pas masquer un joueur fraîchement indexé
+        ttl = 7 * 24 * 3600 if data else 60
+        self.cache.set_absolute(key, data, ttl_seconds=ttl)
         return data
 
     def get_match(self, platform: str, match_id: str) -> List[Dict[str, Any]]:
+        """Détails publics d'un match, servis depuis le cache disque persistant
+        (expiration glissante 15 jours) — un match terminé est immuable."""
         key = f"match:{platform}:{match_id}"
         cached = self.cache.get(key)
         if cached is not None:
@@ -188,65 +534,174 @@ class SuperviveService:
 
         res = self._get(f"api/matches/{platform}-{match_id}")
         res.raise_for_status()
-        data = res.json()
+        data = _response_json(res)
 
         # Expiration glissante 15 jours
         self.cache.set_sliding(key, data, ttl_seconds=15 * 24 * 3600)
         return data
 
-    def get_player_matches(self, platform: str, player_id: str, page: int = 1) -> Dict[str, Any]:
-        normalized = player_id.replace("-", "")
-        res = self._get(f"api/players/{platform}-{normalized}/matches", params={"page": str(page)})
+    def get_player_matches(self, platform: str, player_id: str, page: int = 1, use_cache: bool = True) -> Dict[str, Any]:
+        normalized = _normalize_pid(player_id)
+        # TTL court: des invocations CLI rapprochées (placement_stats puis
+        # combat_stats) relisent les mêmes pages sans re-frapper l'API
+        key = f"matches:{platform}:{normalized}:{page}"
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        path = f"api/players/{platform}-{normalized}/matches"
+        if ijson is not None:
+            # Parser le flux au fil de l'eau: évite de matérialiser à la fois
+            # le corps complet et l'arbre d'objets pour les grosses pages
+            res = self._get(path, params={"page": str(page)}, stream=True)
+            res.raise_for_status()
+            res.raw.decode_content = True
+            data: Dict[str, Any] = {}
+            try:
+                # use_float=True: sans lui ijson produit des Decimal que ni
+                # orjson ni json ne savent sérialiser vers le cache
+                for k, v in ijson.kvitems(res.raw, "", use_float=True):
+                    data[k] = v
+            finally:
+                res.close()
+            if not data:
+                raise ValueError("data is null")
+            self.cache.set_absolute(key, data, ttl_seconds=60)
+            return data
+        res = self._get(path, params={"page": str(page)})
         res.raise_for_status()
-        data = res.json()
+        data = _response_json(res)
         if data is None:
             raise ValueError("data is null")
+        self.cache.set_absolute(key, data, ttl_seconds=60)
         return data
 
+    async def _aget_player_matches_many(self, platform: str, player_id: str, page_numbers: List[int]) -> List[Dict[str, Any]]:
+        """Récupère plusieurs pages de matchs en parallèle via httpx.AsyncClient."""
+        import asyncio
+
+        normalized = _normalize_pid(player_id)
+        url = self._url(f"api/players/{platform}-{normalized}/matches")
+        timeout = self._get_timeout
+
+        # Même cache court que le chemin synchrone: seules les pages
+        # manquantes partent sur le réseau
+        results: Dict[int, Dict[str, Any]] = {}
+        to_fetch: List[int] = []
+        for p in page_numbers:
+            cached = self.cache.get(f"matches:{platform}:{normalized}:{p}")
+            if cached is not None:
+                results[p] = cached
+            else:
+                to_fetch.append(p)
+        if to_fetch:
+            # En HTTP/2 toutes les pages multiplexent sur une seule connexion
+            # TLS; retries=3 couvre les échecs de connexion côté transport
+            limits = httpx.Limits(max_keepalive_connections=8, max_connections=32)
+            transport = httpx.AsyncHTTPTransport(http2=_HTTP2, limits=limits, retries=3)
+            async with httpx.AsyncClient(
+                transport=transport, timeout=timeout, headers={"User-Agent": USER_AGENT}
+            ) as client:
+                async def fetch(page: int) -> None:
+                    # Mêmes statuts re-tentés que la Session requests, avec le
+                    # même backoff exponentiel à jitter complet; une page qui
+                    # échoue malgré tout est abandonnée sans couler le fan-out
+                    for attempt in range(4):
+                        if attempt:
+                            await asyncio.sleep(random.uniform(0.0, float(2 ** (attempt - 1))))
+                        try:
+                            res = await client.get(url, params={"page": str(page)})
+                        except httpx.HTTPError:
+                            continue
+                        if res.status_code in (429, 500, 502, 503, 504):
+                            continue
+                        if res.status_code >= 400:
+                            return
+                        data = res.json()
+                        self.cache.set_absolute(f"matches:{platform}:{normalized}:{page}", data, ttl_seconds=60)
+                        results[page] = data
+                        return
+
+                await asyncio.gather(*(fetch(p) for p in to_fetch))
+        # Une page manquante rend un dict vide: l'appelant s'arrête à cette
+        # page comme lorsque l'API n'a plus de données
+        return [results.get(p, {}) for p in page_numbers]
+
     def get_player_matches_pages(self, platform: str, player_id: str, pages: int = 20) -> List[Dict[str, Any]]:
         """Récupère jusqu'à `pages` pages de matchs pour un joueur.
         S'arrête plus tôt si l'API n'a plus de données.
+
+        La page 1 est lue en premier pour connaître `meta.last_page`; les
+        pages restantes sont ensuite récupérées en parallèle (httpx) au lieu
+        d'enchaîner les allers-retours réseau.
         """
-        all_items: List[Dict[str, Any]] = []
-        current_page = 1
-        last_page = None
-        while current_page <= pages:
-            payload = self.get_player_matches(platform, player_id, page=current_page)
+        first = self.get_player_matches(platform, player_id, page=1)
+        all_items: List[Dict[str, Any]] = list(first.get("data", []) if isinstance(first, dict) else [])
+        if not all_items:
+            return all_items
+
+        meta = first.get("meta") if isinstance(first, dict) else None
+        last_page = 0
+        if meta:
+            last_page = int(meta.get("last_page") or meta.get("lastPage") or 0)
+        max_page = min(pages, last_page) if last_page else pages
+        remaining = list(range(2, max_page + 1))
+        if not remaining:
+            return all_items
+
+        if httpx is not None:
+            import asyncio
+
+            payloads = asyncio.run(self._aget_player_matches_many(platform, player_id, remaining))
+        else:
+            # Repli sans httpx: fan-out threadé sur la Session partagée
+            # (pool_maxsize dimensionné en conséquence)
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(max_workers=min(len(remaining), 16)) as ex:
+                payloads = list(
+                    ex.map(lambda p: self.get_player_matches(platform, player_id, page=p), remaining)
+                )
+        for payload in payloads:
             items = payload.get("data", []) if isinstance(payload, dict) else []
-            all_items.extend(items)
-            meta = payload.get("meta") if isinstance(payload, dict) else None
-            if meta:
-                last_page = int(meta.get("last_page") or meta.get("lastPage") or 0)
-                if last_page and current_page >= last_page:
-                    break
             if not items:
                 break
-            current_page += 1
+            all_items.extend(items)
         return all_items
 
     def _get_xsrf_token(self, platform: str, player_id: str) -> str:
-        normalized = player_id.replace("-", "")
+        normalized = _normalize_pid(player_id)
         res = self._get_no_retry(f"api/players/{platform}-{normalized}/matches", params={"page": "1"})
 
-        # Lire les en-têtes Set-Cookie
-        cookies = res.headers.get("Set-Cookie")
-        if not cookies:
-            # Certaines implémentations renvoient multiples en-têtes; requests les concatène parfois
-            cookies_list = res.raw.headers.getlist("Set-Cookie") if hasattr(res.raw.headers, "getlist") else []
+        # Chemin rapide: requests a déjà parsé les Set-Cookie dans le jar
+        token = res.cookies.get("XSRF-TOKEN")
+        if token:
+            return urllib.parse.unquote(token) if "%" in token else token
+
+        # Repli: lire les en-têtes Set-Cookie bruts (multiples possibles,
+        # attributs de domaine/chemin exotiques), puis un seul passage regex
+        # au niveau octets sur le tout
+        if hasattr(res.raw.headers, "getlist"):
+            cookies_list = res.raw.headers.getlist("Set-Cookie")
         else:
-            cookies_list = [cookies]
+            cookies = res.headers.get("Set-Cookie")
+            cookies_list = [cookies] if cookies else []
 
-        for cookie_header in cookies_list:
-            if "XSRF-TOKEN=" not in cookie_header:
-                continue
-            m = _XSRF_REGEX.search(cookie_header)
-            if m:
-                return urllib.parse.unquote(m.group(1))
+        raw = b"\n".join(
+            h.encode("latin-1") if isinstance(h, str) else h for h in cookies_list
+        )
+        m = _XSRF_REGEX.search(raw)
+        if m:
+            tok = m.group(1)
+            if b"%" not in tok:
+                # Cas courant (token base64-url): aucun échappement à décoder
+                return tok.decode("latin-1")
+            return urllib.parse.unquote_to_bytes(tok).decode("utf-8")
         raise RuntimeError("Could not find correct cookie property")
 
     def fetch_new_player_matches(self, platform: str, player_id: str) -> Dict[str, Any]:
         csrf = self._get_xsrf_token(platform, player_id)
-        normalized = player_id.replace("-", "")
+        normalized = _normalize_pid(player_id)
         headers = {"X-XSRF-TOKEN": csrf}
         res = self._post_no_retry(f"api/players/{platform}-{normalized}/matches/fetch", headers=headers)
 
@@ -254,7 +709,7 @@ class SuperviveService:
         if ("text/html" in content_type) or (not content_type):
             raise RuntimeError("Invalid player id or XSRF Token")
 
-        payload = res.json()
+        payload = _response_json(res)
         if payload is None:
             raise ValueError("data is null")
         return payload
@@ -340,11 +795,11 @@ if __name__ == "__main__":
     svc = SuperviveService()
 
     if args.cmd == "check":
-        print(json.dumps({"exists": svc.check_player_exists(args.platform, args.unique_display_name)}, ensure_ascii=False))
+        _print_json({"exists": svc.check_player_exists(args.platform, args.unique_display_name)})
     elif args.cmd == "search":
-        print(json.dumps(svc.search_players(args.query), ensure_ascii=False))
+        _print_json(svc.search_players(args.query))
     elif args.cmd == "match":
-        print(json.dumps(svc.get_match(args.platform, args.match_id), ensure_ascii=False))
+        _print_json(svc.get_match(args.platform, args.match_id))
     elif args.cmd == "player_matches":
         raw = svc.get_player_matches(args.platform, args.player_id, page=args.page)
         items = raw.get("data", []) if isinstance(raw, dict) else []
@@ -358,14 +813,13 @@ if __name__ == "__main__":
                     "image_url": hero.get("head_image_url") or hero.get("image_url")
                 }
             })
-        print(json.dumps(simplified, ensure_ascii=False))
+        _print_json(simplified)
     elif args.cmd == "fetch_new":
-        print(json.dumps(svc.fetch_new_player_matches(args.platform, args.player_id), ensure_ascii=False))
+        _print_json(svc.fetch_new_player_matches(args.platform, args.player_id))
     elif args.cmd == "placement_stats":
         try:
-            import matplotlib
-            matplotlib.use("Agg")  # rendu hors écran
-            import matplotlib.pyplot as plt
+            plt = _get_plt()
+            import numpy as np
         except Exception as e:
             raise SystemExit(f"matplotlib requis: pip install matplotlib\n{e}")
 
@@ -381,13 +835,13 @@ if __name__ == "__main__":
         # Préparer les stats
         n = len(placements)
         xs = list(range(1, n + 1))
-        # moyenne mobile sur 10 parties
+        # moyenne mobile sur 10 parties, via sommes cumulées (O(N) vectorisé)
         window = 10
-        rolling = []
-        for i in range(n):
-            start = max(0, i - window + 1)
-            subset = placements[start : i + 1]
-            rolling.append(sum(subset) / len(subset))
+        arr = np.asarray(placements, dtype=float)
+        csum = np.cumsum(np.insert(arr, 0, 0.0))
+        idx = np.arange(1, n + 1)
+        starts = np.maximum(0, idx - window)
+        rolling = (csum[idx] - csum[starts]) / (idx - starts)
 
         fig, axes = plt.subplots(2, 2, figsize=(12, 8))
 
@@ -413,11 +867,7 @@ if __name__ == "__main__":
         axes[1, 0].set_title("Répartition des placements")
 
         # 4) Courbe cumulée de la moyenne (performance globale)
-        cumulative_avg = []
-        running_sum = 0
-        for i, v in enumerate(placements, start=1):
-            running_sum += v
-            cumulative_avg.append(running_sum / i)
+        cumulative_avg = csum[1:] / idx
         axes[1, 1].plot(xs, cumulative_avg, color="green", linewidth=2)
         axes[1, 1].invert_yaxis()
         axes[1, 1].set_title("Moyenne cumulée du placement")
@@ -426,14 +876,17 @@ if __name__ == "__main__":
 
         fig.tight_layout()
         fig.savefig(args.out, dpi=150)
-        print(json.dumps({"output": args.out, "games": n}, ensure_ascii=False))
+        plt.close(fig)
+        _print_json({"output": args.out, "games": n})
     elif args.cmd == "combat_stats":
         try:
-            import matplotlib
-            matplotlib.use("Agg")
-            import matplotlib.pyplot as plt
+            plt = _get_plt()
+            import numpy as np
+            import pandas as pd
+            import seaborn as sns
+            from matplotlib.ticker import MaxNLocator, FormatStrFormatter
         except Exception as e:
-            raise SystemExit(f"matplotlib requis: pip install matplotlib\n{e}")
+            raise SystemExit(f"numpy/pandas/seaborn/matplotlib requis: pip install numpy pandas seaborn matplotlib\n{e}")
 
         items = svc.get_player_matches_pages(args.platform, args.player_id, pages=args.pages)
         if not items:
@@ -445,25 +898,35 @@ if __name__ == "__main__":
         items = [it for it in items if (it.get("queue_id") == "default") and (it.get("is_ranked") is True)]
 
         # Extraire séries temporelles K/D et par chasseur
-        kills_series = []
-        deaths_series = []
-        hunter_kills: Dict[str, int] = {}
-        hunter_deaths: Dict[str, int] = {}
+        def _hero_of(it: Dict[str, Any]) -> str:
+            hero_obj = it.get("hero") or {}
+            return hero_obj.get("name") or hero_obj.get("asset_id") or "unknown"
 
-        for it in items:
-            stats = it.get("stats") or {}
-            k = stats.get("Kills")
-            d = stats.get("Deaths")
+        def _stat_int(stats: Dict[str, Any], key: str) -> int:
+            v = stats.get(key)
             # Valeurs par défaut à 0 si non présents
-            k = int(k) if isinstance(k, (int, float)) else 0
-            d = int(d) if isinstance(d, (int, float)) else 0
-            kills_series.append(k)
-            deaths_series.append(d)
-            hero = (it.get("hero") or {}).get("name") or (it.get("hero") or {}).get("asset_id") or "unknown"
-            hunter_kills[hero] = hunter_kills.get(hero, 0) + k
-            # Ajustement KD par chasseur: si D == 0 et K > 0, compter D = 1 pour l'agrégation
-            adjusted_d = d if d > 0 else (1 if k > 0 else 0)
-            hunter_deaths[hero] = hunter_deaths.get(hero, 0) + d
+            return int(v) if isinstance(v, (int, float)) else 0
+
+        # columns= explicite: sans elle un `items` filtré à vide produirait un
+        # DataFrame sans colonnes et df["k"] lèverait KeyError
+        df = pd.DataFrame(
+            (
+                {
+                    "hero": _hero_of(it),
+                    "k": _stat_int(it.get("stats") or {}, "Kills"),
+                    "d": _stat_int(it.get("stats") or {}, "Deaths"),
+                }
+                for it in items
+            ),
+            columns=["hero", "k", "d"],
+        )
+        kills_series = df["k"].tolist()
+        deaths_series = df["d"].tolist()
+        # Un seul groupby C-level remplace les boucles dict Python
+        agg = df.groupby("hero").agg(kills=("k", "sum"), deaths=("d", "sum"), games=("k", "count"))
+        hunter_kills: Dict[str, int] = agg["kills"].to_dict()
+        hunter_deaths: Dict[str, int] = agg["deaths"].to_dict()
+        hunter_counts: Dict[str, int] = agg["games"].to_dict()
 
         n = len(kills_series)
         xs = list(range(1, n + 1))
@@ -480,13 +943,6 @@ if __name__ == "__main__":
         }
 
         # Améliorations de présentation (style, robustesse, annotations)
-        try:
-            import numpy as np
-            import seaborn as sns
-            from matplotlib.ticker import MaxNLocator, FormatStrFormatter
-        except Exception as e:
-            raise SystemExit(f"numpy et seaborn requis: pip install numpy seaborn\n{e}")
-
         sns.set_theme(style="whitegrid", context="talk")
         plt.rcParams.update({
             "figure.dpi": 150,
@@ -496,35 +952,36 @@ if __name__ == "__main__":
             "axes.titleweight": "bold",
         })
 
-        # Préparer KD avec gestion des infinis (0 morts)
-        kd_series: List[float] = []
-        is_inf: List[bool] = []
-        for k, d in zip(kills_series, deaths_series):
-            if d > 0:
-                kd_series.append(k / d)
-                is_inf.append(False)
-            else:
-                if k > 0:
-                    kd_series.append(np.nan)
-                    is_inf.append(True)
-                else:
-                    kd_series.append(0.0)
-                    is_inf.append(False)
-
-        kd_arr = np.array(kd_series, dtype=float)
-
-        # Médiane glissante
+        # Préparer KD avec gestion des infinis (0 morts), sans liste Python
+        # intermédiaire: tout se calcule sur les colonnes du DataFrame
+        k_col = df["k"].to_numpy(dtype=float)
+        d_col = df["d"].to_numpy(dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            kd_arr = np.where(d_col > 0, k_col / d_col, np.where(k_col > 0, np.nan, 0.0))
+        is_inf = (d_col == 0) & (k_col > 0)
+
+        # Médiane glissante vectorisée. bottleneck (optionnel) fournit un
+        # move_median C à deux tas, nativement NaN-aware; sinon fenêtres via
+        # sliding_window_view sur un tableau paddé de NaN (les NaN sont
+        # ignorés par nanmedian)
         window = 10
-        roll_med: List[float] = []
-        for i in range(len(kd_arr)):
-            s = max(0, i - window + 1)
-            win = kd_arr[s : i + 1]
-            win = win[~np.isnan(win)]
-            if win.size == 0:
-                roll_med.append(np.nan)
-            else:
-                roll_med.append(float(np.median(win)))
-        roll_med = np.array(roll_med)
+        try:
+            import bottleneck as bn
+        except ImportError:
+            bn = None
+        if kd_arr.size == 0:
+            # Filtre ranked vide: aucune fenêtre possible, tracé vide en aval
+            roll_med = kd_arr
+        elif bn is not None:
+            # bottleneck exige window <= N: borner pour les petites séries
+            roll_med = bn.move_median(kd_arr, window=min(window, kd_arr.size), min_count=1)
+        else:
+            padded = np.concatenate([np.full(window - 1, np.nan), kd_arr])
+            kd_windows = np.lib.stride_tricks.sliding_window_view(padded, window)
+            import warnings
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)  # fenêtres toutes-NaN
+                roll_med = np.nanmedian(kd_windows, axis=1)
 
         # Plafond y via quantile 95e pour lisibilité
         finite_vals = kd_arr[~np.isnan(kd_arr)]
@@ -570,7 +1027,7 @@ if __name__ == "__main__":
         min_games = 5
         hunters_sorted = sorted(hunters, key=lambda h: hunter_kd.get(h, 0.0), reverse=True)
         kd_vals = [hunter_kd.get(h, 0.0) for h in hunters_sorted]
-        counts = [sum(1 for it in items if ((it.get("hero") or {}).get("name") or (it.get("hero") or {}).get("asset_id") or "unknown") == h) for h in hunters_sorted]
+        counts = [hunter_counts.get(h, 0) for h in hunters_sorted]
 
         colors = ["#4daf4a" if c >= min_games else "#bdbdbd" for c in counts]
         bars = ax1.bar(hunters_sorted, kd_vals, color=colors)
@@ -607,28 +1064,20 @@ if __name__ == "__main__":
                 fig.savefig(args.out[:-4] + ".pdf", bbox_inches="tight")
         except Exception:
             pass
-
-        fig.tight_layout()
-        fig.savefig(args.out, dpi=150)
+        plt.close(fig)
 
         # --- Nouvelle figure: Kills par partie (avec moyenne glissante) et Kills par chasseur ---
-        # Calcul moyenne glissante simple (fenêtre 10)
+        # Moyenne glissante (fenêtre 10) via sommes cumulées
         k_window = 10
-        rolling_kills: List[float] = []
-        for i in range(n):
-            s = max(0, i - k_window + 1)
-            subset = kills_series[s : i + 1]
-            rolling_kills.append(sum(subset) / len(subset) if subset else 0.0)
+        k_arr = np.asarray(kills_series, dtype=float)
+        k_csum = np.cumsum(np.insert(k_arr, 0, 0.0))
+        k_idx = np.arange(1, n + 1)
+        k_starts = np.maximum(0, k_idx - k_window)
+        rolling_kills = (k_csum[k_idx] - k_csum[k_starts]) / (k_idx - k_starts)
 
         # Préparer tri des kills par chasseur (par moyenne de kills par partie)
-        # Calculer le nombre de parties par chasseur
-        hunter_games: Dict[str, int] = {}
-        for it in items:
-            hero_name = (it.get("hero") or {}).get("name") or (it.get("hero") or {}).get("asset_id") or "unknown"
-            hunter_games[hero_name] = hunter_games.get(hero_name, 0) + 1
-
         def _avg_kills(h: str) -> float:
-            games = hunter_games.get(h, 0)
+            games = hunter_counts.get(h, 0)
             return (hunter_kills.get(h, 0) / games) if games > 0 else 0.0
 
         hunters_by_kills = sorted(hunters, key=lambda h: _avg_kills(h), reverse=True)
@@ -666,15 +1115,11 @@ if __name__ == "__main__":
             else:
                 out2 = (out2 or "combat_stats") + ".kills.png"
             fig2.savefig(out2, dpi=200, bbox_inches="tight", facecolor="white")
+            plt.close(fig2)
         except Exception:
             pass
 
         # Résumé JSON: global + top 5 chasseurs par KD (min 5 parties jouées si possible)
-        hunter_counts: Dict[str, int] = {}
-        for it in items:
-            hero = (it.get("hero") or {}).get("name") or (it.get("hero") or {}).get("asset_id") or "unknown"
-            hunter_counts[hero] = hunter_counts.get(hero, 0) + 1
-
         # Filtre min games = 5 si possible, sinon prendre tous
         eligible = [h for h in hunters if hunter_counts.get(h, 0) >= 5]
         if not eligible:
@@ -696,7 +1141,7 @@ if __name__ == "__main__":
                 for h in top_by_kd
             ],
         }
-        print(json.dumps(summary, ensure_ascii=False))
+        _print_json(summary)
     elif args.cmd == "mmr_rating":
         # 1) OAuth: échanger platform_token contre access_token
         oauth_url = args.oauth_base.rstrip("/") + "/iam/v4/oauth/platforms/steam/token"
@@ -709,7 +1154,6 @@ if __name__ == "__main__":
             "Namespace": args.namespace,
             "Game-Client-Version": args.game_client_version,
             "AccelByte-SDK-Version": args.sdk_version,
-            "User-Agent": "Loki/UE5-CL-0 (http-legacy) Windows/10.0.26100.1.256.64bit",
         }
         form = {
             "platform_token": args.platform_token,
@@ -717,7 +1161,7 @@ if __name__ == "__main__":
             "macAddress": args.device_token,
             "additionalData": json.dumps({"flightId": args.flight_id}),
         }
-        sess = requests.Session()
+        sess = _MMR_SESSION
         oauth_res = sess.post(oauth_url, params=params, headers=headers, data=form, cookies={"device-token": args.device_token}, timeout=60)
         oauth_res.raise_for_status()
         oauth_payload = oauth_res.json()
@@ -735,14 +1179,13 @@ if __name__ == "__main__":
             "Accept": "*/*",
             "x-theorycraft-clientversion": args.mmr_client_version,
             "Authorization": f"Bearer {access_token}",
-            "User-Agent": "Loki/UE5-CL-0 (http-legacy) Windows/10.0.26100.1.256.64bit",
         }
         mmr_res = sess.get(mmr_url, headers=mmr_headers, timeout=60)
         mmr_res.raise_for_status()
-        print(json.dumps(mmr_res.json(), ensure_ascii=False))
+        _print_json(mmr_res.json())
     elif args.cmd == "mmr_rating_v3":
         # OAuth v3: grant_type=password pour obtenir un access_token
-        sess = requests.Session()
+        sess = _MMR_SESSION
 
         # form = {
         #     "password": args.password,
@@ -768,71 +1211,81 @@ if __name__ == "__main__":
             "Accept": "*/*",
             "x-theorycraft-clientversion": "",
             "Authorization": f"Bearer {access_token}",
-            "User-Agent": "Loki/UE5-CL-0 (http-legacy) Windows/10.0.26100.1.256.64bit",
         }
         # Déterminer l'user_id: dans la réponse ou dans le JWT (claim)
         user_id = "80421fd76eb541e79dacd35bfdcefb49"
         if not user_id:
             try:
-                parts = str(access_token).split(".")
-                if len(parts) >= 2:
-                    import base64
-                    def _b64url_decode(s: str) -> bytes:
-                        s += "=" * (-len(s) % 4)
-                        return base64.urlsafe_b64decode(s.encode("utf-8"))
-                    payload_raw = _b64url_decode(parts[1])
-                    claims = json.loads(payload_raw.decode("utf-8"))
-                    user_id = claims.get("user_id") or claims.get("userId") or claims.get("uid") or claims.get("sub")
+                claims = _jwt_claims(str(access_token))
+                user_id = claims.get("user_id") or claims.get("userId") or claims.get("uid") or claims.get("sub")
             except Exception:
                 user_id = None
         if not user_id:
             raise SystemExit("OAuth v3: user_id introuvable dans la réponse/token")
 
-        # Appeler l'endpoint MMR
-        mmr_url = args.mmr_base.rstrip("/") + f"/mmr/player-ratings/{user_id}/rank"
-        mmr_res = sess.get(mmr_url, headers=mmr_headers, timeout=60)
-        mmr_res.raise_for_status()
-        print(json.dumps(mmr_res.json(), ensure_ascii=False))
+        # Appeler l'endpoint MMR; via httpx/HTTP/2 quand disponible (le même
+        # helper multiplexe plusieurs user_ids pour les pipelines batch)
+        if httpx is not None:
+            import asyncio
+
+            rank = asyncio.run(_afetch_mmr_ranks([user_id], access_token, args.mmr_base, ""))[0]
+        else:
+            mmr_url = args.mmr_base.rstrip("/") + f"/mmr/player-ratings/{user_id}/rank"
+            mmr_res = sess.get(mmr_url, headers=mmr_headers, timeout=60)
+            mmr_res.raise_for_status()
+            rank = mmr_res.json()
+        _print_json(rank)
     elif args.cmd == "mmr_correlation":
-        # Charger MMR JSON
         try:
-            with open(args.mmr_json, "r", encoding="utf-8") as f:
-                mmr_payload = json.load(f)
+            import math
+            plt = _get_plt()
+            import numpy as np
+            import pandas as pd
         except Exception as e:
-            raise SystemExit(f"Impossible de lire --mmr_json: {e}")
+            raise SystemExit(f"numpy/pandas/matplotlib requis: pip install numpy pandas matplotlib\n{e}")
 
-        # Extraire updates de la file par défaut
-        updates = []
+        # Charger MMR JSON: seul QueueRankRating.default.Updates est consommé,
+        # ijson streame ce tableau sans matérialiser le reste du payload
         try:
-            qrr = (mmr_payload.get("QueueRankRating") or {}).get("default") or {}
-            updates = qrr.get("Updates") or []
-        except Exception:
-            updates = []
+            if ijson is not None:
+                with open(args.mmr_json, "rb") as f:
+                    updates = list(ijson.items(f, "QueueRankRating.default.Updates.item", use_float=True))
+            else:
+                with open(args.mmr_json, "rb") as f:
+                    buf = f.read()
+                mmr_payload = orjson.loads(buf) if orjson is not None else json.loads(buf)
+                qrr = (mmr_payload.get("QueueRankRating") or {}).get("default") or {}
+                updates = qrr.get("Updates") or []
+        except Exception as e:
+            raise SystemExit(f"Impossible de lire --mmr_json: {e}")
         if not updates:
             raise SystemExit("Aucune 'Updates' trouvée dans le JSON MMR (QueueRankRating.default.Updates)")
 
         # Récupérer les matchs Supervive (pages)
         items = svc.get_player_matches_pages(args.platform, args.player_id, pages=args.pages)
         # Indexer par match id probable
+        # N'indexer que les matchs réellement référencés par les updates MMR
+        needed_mids = {u.get("MatchID") or u.get("match_id") for u in updates}
+        needed_mids.discard(None)
         by_match: Dict[str, Dict[str, Any]] = {}
         for it in items:
-            mid = it.get("match_id") or it.get("matchId") or it.get("id") or it.get("MatchID")
-            if isinstance(mid, str):
+            mid = _first_key(it, _MATCH_ID_KEYS)
+            if isinstance(mid, str) and mid in needed_mids:
                 by_match[mid] = it
 
         # Construire dataset corrélé
         rows: List[Dict[str, Any]] = []
         for u in updates:
-            mid = u.get("MatchID") or u.get("match_id")
+            mid = _first_key(u, _UPDATE_MID_KEYS)
             if not isinstance(mid, str):
                 continue
             sv = by_match.get(mid)
             stats = (sv or {}).get("stats") or {}
             # Champs supplémentaires potentiels avec clés de secours
-            creep_kills = stats.get("CreepKills") or stats.get("CreepsKilled") or stats.get("CreepsKills")
-            hero_damage = stats.get("HeroDamageDone") or stats.get("HeroEffectiveDamageDone")
-            gold_treasure = stats.get("GoldFromTreasure") or stats.get("TreasureGold") or stats.get("GoldTreasure")
-            gold_monsters = stats.get("GoldFromMonsters") or stats.get("MonstersGold") or stats.get("GoldMonsters")
+            creep_kills = _first_key(stats, _CREEP_KILLS_KEYS)
+            hero_damage = _first_key(stats, _HERO_DAMAGE_KEYS)
+            gold_treasure = _first_key(stats, _GOLD_TREASURE_KEYS)
+            gold_monsters = _first_key(stats, _GOLD_MONSTERS_KEYS)
             row = {
                 "match_id": mid,
                 "rating_delta": u.get("RatingDelta"),
@@ -854,13 +1307,6 @@ if __name__ == "__main__":
             }
             rows.append(row)
 
-        # Filtrer valeurs numériques
-        def _to_float(x: Any) -> float:
-            try:
-                return float(x)
-            except Exception:
-                return float("nan")
-
         # Colonnes d'intérêt
         cols = [
             ("kills", "Kills (API)"),
@@ -878,44 +1324,31 @@ if __name__ == "__main__":
         ]
 
         # Calculer corrélations de Pearson
-        try:
-            import math
-            import numpy as np
-            import seaborn as sns
-            import matplotlib.pyplot as plt
-        except Exception as e:
-            raise SystemExit(f"numpy/seaborn/matplotlib requis: pip install numpy seaborn matplotlib\n{e}")
-
-        # Construire arrays
-        y = np.array([_to_float(r.get("rating_delta")) for r in rows], dtype=float)
+        # Ingestion colonnaire unique: pd.to_numeric(errors="coerce") fait
+        # la conversion en C (NaN pour les valeurs invalides) au lieu de
+        # n_rows*n_cols lookups dict Python
+        col_keys = [k for k, _ in cols]
+        col_labels = dict(cols)  # libellé par clé en O(1), plutôt que scanner cols
+        num = pd.DataFrame(rows, columns=col_keys + ["rating_delta"]).apply(pd.to_numeric, errors="coerce")
+        data = num[col_keys].to_numpy(dtype=np.float64)
+        y = num["rating_delta"].to_numpy(dtype=np.float64)
         valid_mask = ~np.isnan(y)
 
-        correlations: Dict[str, float] = {}
-        for key, _ in cols:
-            x = np.array([_to_float(r.get(key)) for r in rows], dtype=float)
-            m = valid_mask & ~np.isnan(x)
-            if m.sum() >= 3:
-                x_m = x[m]
-                y_m = y[m]
-                # Pearson r
-                x_std = x_m.std(ddof=1)
-                y_std = y_m.std(ddof=1)
-                if x_std > 0 and y_std > 0:
-                    r = float(np.corrcoef(x_m, y_m)[0, 1])
-                else:
-                    r = float("nan")
-            else:
-                r = float("nan")
-            correlations[key] = r
+        pair_mask = valid_mask[:, None] & ~np.isnan(data)  # (n, C)
+        counts = pair_mask.sum(axis=0)
+        xm = np.where(pair_mask, data, 0.0)
+        ym = np.where(pair_mask, y[:, None], 0.0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            sx = xm.sum(axis=0)
+            sy = ym.sum(axis=0)
+            cov = (xm * ym).sum(axis=0) - sx * sy / counts
+            var_x = (xm * xm).sum(axis=0) - sx * sx / counts
+            var_y = (ym * ym).sum(axis=0) - sy * sy / counts
+            r_all = cov / np.sqrt(var_x * var_y)
+        r_all = np.where((counts >= 3) & (var_x > 0) & (var_y > 0), r_all, np.nan)
+        correlations: Dict[str, float] = {k: float(r_all[i]) for i, k in enumerate(col_keys)}
 
         # Tracé: matrice de corrélations et scatter pour top 3 corrélés en valeur absolue
-        # Préparer dataframe léger
-        try:
-            import pandas as pd
-            df = pd.DataFrame(rows)
-        except Exception:
-            df = None
-
         # Sélection top 3
         ranked = sorted([(k, abs(v)) for k, v in correlations.items() if not math.isnan(v)], key=lambda t: t[1], reverse=True)
         top_keys = [k for k, _ in ranked[:3]]
@@ -936,56 +1369,61 @@ if __name__ == "__main__":
         # 2) Scatters top features
         for idx, key in enumerate(top_keys):
             ax = axes[1, idx]
-            xv = np.array([_to_float(r.get(key)) for r in rows], dtype=float)
+            xv = data[:, col_keys.index(key)]
             m = valid_mask & ~np.isnan(xv)
             if m.sum() >= 3:
-                ax.scatter(xv[m], y[m], s=18, alpha=0.6)
-                # régression linéaire simple
-                try:
-                    coef = np.polyfit(xv[m], y[m], 1)
-                    xp = np.linspace(xv[m].min(), xv[m].max(), 50)
-                    yp = coef[0] * xp + coef[1]
-                    ax.plot(xp, yp, color="#d62728", lw=2)
-                except Exception:
-                    pass
-            ax.set_xlabel(next(lbl for k2, lbl in cols if k2 == key))
+                xm_s = xv[m]
+                ym_s = y[m]
+                ax.scatter(xm_s, ym_s, s=18, alpha=0.6)
+                # Régression linéaire simple en forme close (cov/var),
+                # inutile de passer par le solveur de np.polyfit pour un degré 1
+                xc = xm_s - xm_s.mean()
+                denom = float((xc * xc).sum())
+                if denom > 0:
+                    slope = float((xc * (ym_s - ym_s.mean())).sum()) / denom
+                    intercept = float(ym_s.mean()) - slope * float(xm_s.mean())
+                    xp = np.linspace(xm_s.min(), xm_s.max(), 50)
+                    ax.plot(xp, slope * xp + intercept, color="#d62728", lw=2)
+            ax.set_xlabel(col_labels[key])
             ax.set_ylabel("RatingDelta")
             ax.grid(True, alpha=0.25)
             ax.set_title(f"Scatter: r={correlations.get(key):.2f}")
 
         fig.tight_layout()
         fig.savefig(args.out, dpi=200, bbox_inches="tight", facecolor="white")
+        plt.close(fig)
 
         # Afficher tableau simple
-        summary = { next(lbl for k2, lbl in cols if k2 == k): v for k, v in correlations.items() }
-        print(json.dumps({"output": args.out, "n": int(len(rows)), "correlations": summary}, ensure_ascii=False))
+        summary = {col_labels[k]: v for k, v in correlations.items()}
+        _print_json({"output": args.out, "n": int(len(rows)), "correlations": summary})
     elif args.cmd == "jin_builds_details":
         try:
+            plt = _get_plt()
             import numpy as np
-            import matplotlib
-            matplotlib.use("Agg")
-            import matplotlib.pyplot as plt
         except Exception as e:
             raise SystemExit(f"matplotlib requis: pip install matplotlib\n{e}")
 
+        from collections import Counter
+
         # Charger IDs de matchs
         items = svc.get_player_matches_pages(args.platform, args.player_id, pages=args.pages)
 
         # Normaliser liste de match_ids (tolérant)
         match_ids: list[str] = []
         for it in items:
-            mid = it.get("match_id") or it.get("MatchID") or it.get("id") or it.get("matchId")
+            mid = _first_key(it, _MATCH_ID_KEYS)
             if isinstance(mid, str):
                 match_ids.append(mid)
 
-        # Fonction utilitaire
+        # Fonctions utilitaires. La normalisation est mémoïsée: les mêmes
+        # noms de héros reviennent à chaque match du même joueur
+        @lru_cache(maxsize=256)
+        def _norm_hero(s: str) -> str:
+            return s.strip().lower()
+
         def _is_jin_name_or_asset(name_val: Any, asset_val: Any) -> bool:
-            def _norm(s: Any) -> str:
-                return str(s or "").strip().lower()
-            n = _norm(name_val)
-            a = _norm(asset_val)
             # tolérant: contient "jin" dans nom ou asset id
-            return ("jin" in n) or ("jin" in a)
+            return ("jin" in _norm_hero(str(name_val or ""))) or ("jin" in _norm_hero(str(asset_val or "")))
 
         def _num(x: Any) -> float:
             try:
@@ -993,41 +1431,66 @@ if __name__ == "__main__":
             except Exception:
                 return float("nan")
 
-        # Itérer chaque match: récupérer détails publics, trouver l'entrée du joueur, extraire placement + builds
-        rows: List[Dict[str, Any]] = []
-        for mid in match_ids:
+        # Récupérer les détails publics en parallèle (I/O réseau pur); le
+        # parsing reste single-thread sur le dict résultant
+        from concurrent.futures import ThreadPoolExecutor
+
+        def _fetch_details(mid: str):
             try:
-                details = svc.get_match(args.platform, mid)
+                return mid, svc.get_match(args.platform, mid)
             except Exception:
+                return mid, None
+
+        details_by_mid: Dict[str, Any] = {}
+        if match_ids:
+            with ThreadPoolExecutor(max_workers=min(len(match_ids), 16)) as ex:
+                for mid, details in ex.map(_fetch_details, match_ids):
+                    details_by_mid[mid] = details
+
+        # Itérer chaque match: trouver l'entrée du joueur, extraire placement + builds
+        target = _normalize_pid(args.player_id)
+        rows: List[Dict[str, Any]] = []
+        for mid in match_ids:
+            details = details_by_mid.get(mid)
+            if details is None:
                 continue
             # details: liste par joueur
             entry = None
             if isinstance(details, list):
                 # Heuristiques d'appariement joueur
                 for p in details:
-                    pid = p.get("player_id_encoded") or p.get("playerIdEncoded") or ((p.get("player") or {}).get("id"))
-                    norm_pid = str(pid or "").replace("-", "")
-                    target = args.player_id.replace("-", "")
+                    pid = _first_key(p, _PID_KEYS)
+                    if not pid:
+                        match p:
+                            case {"player": {"id": nested_pid}}:
+                                pid = nested_pid
+                            case _:
+                                pid = None
+                    # _normalize_pid est mémoïsé: les mêmes joueurs reviennent
+                    # d'un match à l'autre
+                    norm_pid = _normalize_pid(str(pid)) if pid else ""
                     if norm_pid and (norm_pid == target or norm_pid.endswith(target) or target.endswith(norm_pid)):
                         entry = p
                         break
                 # fallback: prendre même team/hero si unique
                 if entry is None and len(details) > 0:
                     # Prendre la première occurrence de Jin si unique
-                    candidates = [p for p in details if _is_jin_name_or_asset(((p.get("hero") or {}).get("name")), (p.get("hero_asset_id") or p.get("heroAssetId")))]
+                    candidates = [p for p in details if _is_jin_name_or_asset(((p.get("hero") or {}).get("name")), _first_key(p, _HERO_ASSET_KEYS))]
                     if len(candidates) == 1:
                         entry = candidates[0]
             if not isinstance(entry, dict):
                 continue
 
-            hero_name = ((entry.get("hero") or {}).get("name"))
-            hero_asset = (entry.get("hero_asset_id") or entry.get("heroAssetId"))
-            if not _is_jin_name_or_asset(hero_name, hero_asset):
+            # Filtres avant toute extraction: le test is_ranked (simple lookup)
+            # d'abord, puis le test Jin (normalisation de chaînes), pour que
+            # les entrées non retenues ne coûtent quasiment rien
+            is_ranked = _first_key(entry, _IS_RANKED_KEYS)
+            if not bool(is_ranked):
                 continue
 
-            # Ne garder que les parties classées
-            is_ranked = entry.get("is_ranked") or entry.get("IsRanked")
-            if not bool(is_ranked):
+            hero_name = ((entry.get("hero") or {}).get("name"))
+            hero_asset = _first_key(entry, _HERO_ASSET_KEYS)
+            if not _is_jin_name_or_asset(hero_name, hero_asset):
                 continue
 
             placement = entry.get("placement")
@@ -1035,36 +1498,41 @@ if __name__ == "__main__":
 
             # Item build depuis inventory.{Boots, Inventory, Utility}
             def _extract_names(seq: Any) -> list[str]:
-                out: list[str] = []
-                if isinstance(seq, list):
-                    for e in seq:
-                        if isinstance(e, dict):
-                            nm = e.get("name") or e.get("Name") or e.get("asset_id") or e.get("assetId") or e.get("id")
-                            if nm:
-                                out.append(str(nm))
-                        else:
-                            out.append(str(e))
-                elif isinstance(seq, (str, int, float)):
-                    out.append(str(seq))
-                return out
+                match seq:
+                    case list():
+                        out: list[str] = []
+                        for e in seq:
+                            if isinstance(e, dict):
+                                nm = _first_key(e, _NAME_KEYS)
+                                if nm:
+                                    out.append(str(nm))
+                            else:
+                                out.append(str(e))
+                        return out
+                    case str() | int() | float():
+                        return [str(seq)]
+                    case _:
+                        return []
             inventory = entry.get("inventory") or entry.get("Inventory") or {}
             def _ids(seq: Any) -> list[str]:
-                out: list[str] = []
-                if isinstance(seq, list):
-                    for e in seq:
-                        if isinstance(e, dict):
-                            idv = e.get("identifier") or e.get("id") or e.get("name") or e.get("asset_id") or e.get("assetId")
-                            if idv:
-                                out.append(str(idv))
-                        else:
-                            out.append(str(e))
-                elif isinstance(seq, dict):
-                    idv = seq.get("identifier") or seq.get("id") or seq.get("name") or seq.get("asset_id") or seq.get("assetId")
-                    if idv:
-                        out.append(str(idv))
-                elif isinstance(seq, (str, int, float)):
-                    out.append(str(seq))
-                return out
+                match seq:
+                    case list():
+                        out: list[str] = []
+                        for e in seq:
+                            if isinstance(e, dict):
+                                idv = _first_key(e, _ITEM_ID_KEYS)
+                                if idv:
+                                    out.append(str(idv))
+                            else:
+                                out.append(str(e))
+                        return out
+                    case dict():
+                        idv = _first_key(seq, _ITEM_ID_KEYS)
+                        return [str(idv)] if idv else []
+                    case str() | int() | float():
+                        return [str(seq)]
+                    case _:
+                        return []
 
             boots_ids = _ids((inventory or {}).get("Boots"))
             inv_ids = _ids((inventory or {}).get("Inventory"))
@@ -1083,20 +1551,22 @@ if __name__ == "__main__":
             ability_events = entry.get("ability_events") or entry.get("AbilityEvents")
             ability_build = None
             if isinstance(ability_events, list) and ability_events:
+                # Extraction des noms en une passe, puis comptage Counter
+                names = (
+                    str(_first_key(ev, _ABILITY_KEYS) or "")
+                    for ev in ability_events
+                    if isinstance(ev, dict)
+                )
                 ab_labels: list[str] = []
-                ability_levels: Dict[str, int] = {}  # Suivre le niveau de chaque ability
-                for ev in ability_events:
-                    if isinstance(ev, dict):
-                        nm = ev.get("hotkey") or ev.get("ability") or ev.get("name")
-                        level = ev.get("level") or ev.get("Level")
-                        if nm:
-                            nm_str = str(nm)
-                            # Incrémenter le niveau de cette ability
-                            ability_levels[nm_str] = ability_levels.get(nm_str, 0) + 1
-                            # S'arrêter si une ability atteint le niveau 4
-                            if ability_levels[nm_str] >= 4:
-                                break
-                            ab_labels.append(nm_str)
+                levels: Counter = Counter()
+                for nm in names:
+                    if not nm:
+                        continue
+                    levels[nm] += 1
+                    # S'arrêter si une ability atteint le niveau 4
+                    if levels[nm] >= 4:
+                        break
+                    ab_labels.append(nm)
                 if ab_labels:
                     ability_build = ">".join(ab_labels)
             if not ability_build:
@@ -1119,7 +1589,8 @@ if __name__ == "__main__":
 
         # Regrouper et calculer placement moyen par build (garder n>=2 pour stabilité)
         def _group_mean(rows_in: List[Dict[str, Any]], key: str) -> List[tuple[str, float, int]]:
-            buckets: Dict[str, List[float]] = {}
+            labels_list: List[str] = []
+            placements_list: List[float] = []
             for r in rows_in:
                 label = r.get(key)
                 if not isinstance(label, str) or not label:
@@ -1127,11 +1598,22 @@ if __name__ == "__main__":
                 p = _num(r.get("placement"))
                 if np.isnan(p):
                     continue
-                buckets.setdefault(label, []).append(p)
-            out: List[tuple[str, float, int]] = []
-            for lbl, vals in buckets.items():
-                if len(vals) >= max(1, int(args.min_n)):
-                    out.append((lbl, float(np.mean(vals)), len(vals)))
+                labels_list.append(label)
+                placements_list.append(p)
+            if not labels_list:
+                return []
+            # Groupby vectorisé: codes entiers par label puis sommes/effectifs
+            # via bincount, au lieu de buckets dict + np.mean par groupe
+            labels, codes = np.unique(np.asarray(labels_list, dtype=object), return_inverse=True)
+            placements = np.asarray(placements_list, dtype=np.float64)
+            counts = np.bincount(codes)
+            means = np.bincount(codes, weights=placements) / np.maximum(counts, 1)
+            min_n = max(1, int(args.min_n))
+            out = [
+                (str(lbl), float(m), int(c))
+                for lbl, m, c in zip(labels, means, counts)
+                if c >= min_n
+            ]
             out.sort(key=lambda t: t[1])
             return out
 
@@ -1157,13 +1639,13 @@ if __name__ == "__main__":
             means = [t[1] for t in item_top]
             counts = [t[2] for t in item_top]
             y_pos = np.arange(len(labels))
-            ax.barh(y_pos, means, color="#2ca02c")
+            bars = ax.barh(y_pos, means, color="#2ca02c")
             ax.set_yticks(y_pos, labels)
             ax.invert_yaxis()
             ax.set_xlabel("Placement moyen (plus bas est meilleur)")
             ax.set_title("Jin • Placement vs Item Build (détails)")
-            for i, (m, c) in enumerate(zip(means, counts)):
-                ax.text(m + 0.05, i, f"{m:.2f} (n={c})", va="center", fontsize=9)
+            # bar_label dessine toutes les annotations en un seul appel
+            ax.bar_label(bars, labels=[f"{m:.2f} (n={c})" for m, c in zip(means, counts)], padding=3, fontsize=9)
 
         if abil_top:
             ax = axes[idx_ax]
@@ -1171,13 +1653,12 @@ if __name__ == "__main__":
             means = [t[1] for t in abil_top]
             counts = [t[2] for t in abil_top]
             y_pos = np.arange(len(labels))
-            ax.barh(y_pos, means, color="#9467bd")
+            bars = ax.barh(y_pos, means, color="#9467bd")
             ax.set_yticks(y_pos, labels)
             ax.invert_yaxis()
             ax.set_xlabel("Placement moyen (plus bas est meilleur)")
             ax.set_title("Jin • Placement vs Ability Build (détails)")
-            for i, (m, c) in enumerate(zip(means, counts)):
-                ax.text(m + 0.05, i, f"{m:.2f} (n={c})", va="center", fontsize=9)
+            ax.bar_label(bars, labels=[f"{m:.2f} (n={c})" for m, c in zip(means, counts)], padding=3, fontsize=9)
 
         fig.tight_layout()
         out_path = args.out
@@ -1185,7 +1666,8 @@ if __name__ == "__main__":
             fig.savefig(out_path, dpi=200, bbox_inches="tight", facecolor="white")
         except Exception:
             pass
-        print(json.dumps({"output": out_path, "rows": len(rows), "item_groups": len(item_stats), "ability_groups": len(ability_stats)}, ensure_ascii=False))
+        plt.close(fig)
+        _print_json({"output": out_path, "rows": len(rows), "item_groups": len(item_stats), "ability_groups": len(ability_stats)})
     else:
         parser.print_help()
 